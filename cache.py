@@ -0,0 +1,72 @@
+# cache.py
+"""
+Local OHLC cache (SQLite).
+
+Closed candles never change, so they are stored once and only newer
+bars are requested from the exchange on later runs.
+
+Rows are plain tuples: (time, open, high, low, close).
+Keyed on (symbol, interval, time) — the candle's open time.
+The still-forming candle is never written here.
+"""
+
+import sqlite3
+from typing import Iterable, List, Tuple
+
+CACHE_FILE = "ohlc_cache.sqlite"
+
+Row = Tuple[int, float, float, float, float]
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(CACHE_FILE, timeout=10)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS candles (
+            symbol   TEXT    NOT NULL,
+            interval INTEGER NOT NULL,
+            time     INTEGER NOT NULL,
+            open     REAL    NOT NULL,
+            high     REAL    NOT NULL,
+            low      REAL    NOT NULL,
+            close    REAL    NOT NULL,
+            PRIMARY KEY (symbol, interval, time)
+        )
+        """
+    )
+    return conn
+
+
+def load(symbol: str, interval: int, since: int = 0) -> List[Row]:
+    """
+    Return cached closed candles opened after `since`, oldest first.
+    """
+
+    conn = _connect()
+    try:
+        return conn.execute(
+            "SELECT time, open, high, low, close FROM candles "
+            "WHERE symbol = ? AND interval = ? AND time > ? "
+            "ORDER BY time",
+            (symbol, interval, since),
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def save(symbol: str, interval: int, rows: Iterable[Row]) -> None:
+    """
+    Store closed candles. Existing rows with the same open time are replaced.
+    """
+
+    conn = _connect()
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO candles "
+                "(symbol, interval, time, open, high, low, close) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(symbol, interval) + tuple(row) for row in rows],
+            )
+    finally:
+        conn.close()
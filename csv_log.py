@@ -0,0 +1,135 @@
+# csv_log.py
+"""
+Append-only CSV log written by a background thread.
+
+Callers only enqueue rows; a daemon worker takes up to BATCH_SIZE
+queued rows at a time, writes them with one writerows call and
+flushes. Pending rows are drained and the file closed at exit.
+
+If the worker stops, rows are written on the caller's thread instead;
+a failed write is reported on stderr rather than stopping the worker.
+"""
+
+from typing import Iterable, List, Sequence
+import atexit
+import csv
+import os
+import queue
+import sys
+import threading
+
+QUEUE_SIZE = 1024
+BATCH_SIZE = 256
+
+# How often a caller blocked on a full queue re-checks the worker
+_PUT_TIMEOUT = 1.0
+
+_STOP = object()   # sentinel: worker exits after writing what is ahead of it
+
+
+class CSVLog:
+    def __init__(self, path: str, header: Sequence[str]):
+        self._path = path
+        is_new = not os.path.isfile(path)
+
+        self._file = open(path, "a", newline="", buffering=1 << 16)
+        # Plain "\n" rows; quoting is still csv's, so any field is safe
+        self._writer = csv.writer(self._file, lineterminator="\n")
+
+        if is_new:
+            self._writer.writerow(header)
+            self._file.flush()
+
+        self._queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._lock = threading.Lock()   # worker and fallback writes share the file
+        self._closed = False
+        self._worker = threading.Thread(
+            target=self._run, name=f"csv-log:{path}", daemon=True
+        )
+        self._worker.start()
+
+        atexit.register(self.close)
+
+    def log(self, row: Sequence) -> None:
+        self.log_rows((row,))
+
+    def log_rows(self, rows: Iterable[Sequence]) -> None:
+        if self._closed:
+            raise ValueError(f"CSV log {self._path} is closed")
+
+        for row in rows:
+            if not self._enqueue(row):
+                # Worker is gone: write on the caller's thread instead
+                self._write([row])
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._enqueue(_STOP):
+            self._worker.join()
+
+        # Anything the worker did not get to (it died, or never saw _STOP)
+        leftover = []
+        try:
+            while True:
+                leftover.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        leftover = [row for row in leftover if row is not _STOP]
+        try:
+            if leftover:
+                self._write(leftover)
+        finally:
+            self._file.close()
+
+    def _enqueue(self, item) -> bool:
+        """
+        Queue `item` for the worker, waiting while the queue is full.
+        Returns False if the worker is no longer running.
+        """
+
+        while self._worker.is_alive():
+            try:
+                self._queue.put(item, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _write(self, rows: List) -> None:
+        with self._lock:
+            self._writer.writerows(rows)
+            self._file.flush()
+
+    def _run(self) -> None:
+        q = self._queue
+
+        while True:
+            batch: List = [q.get()]
+            try:
+                while len(batch) < BATCH_SIZE and batch[-1] is not _STOP:
+                    batch.append(q.get_nowait())
+            except queue.Empty:
+                pass
+
+            stop = batch[-1] is _STOP
+            if stop:
+                batch.pop()
+
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as exc:
+                    # Keep draining so callers never block on a full
+                    # queue; the lost rows are reported, not hidden.
+                    print(
+                        f"CSV log {self._path}: failed to write "
+                        f"{len(batch)} rows: {exc!r}",
+                        file=sys.stderr,
+                    )
+
+            if stop:
+                return
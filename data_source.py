@@ -9,19 +9,81 @@ Why Kraken:
 - No timestamp formatting issues
 """
 
+from array import array
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
+from functools import lru_cache
+from operator import itemgetter
 from typing import List
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
 import time
 
+import cache
+
 KRAKEN_URL = "https://api.kraken.com/0/public/OHLC"
+KRAKEN_PAIR = "XBTUSD"
+
+# Kraken OHLC row: [time, open, high, low, close, vwap, volume, count]
+_KRAKEN_ROW = itemgetter(0, 1, 2, 3, 4)
+
+# Short connect/read timeouts + retries bound Kraken's slow tail
+# instead of blocking for the full timeout on a stalled request.
+TIMEOUT = (3.05, 5)  # (connect, read) seconds
+
+_RETRY = Retry(
+    total=3,
+    connect=3,
+    read=3,
+    backoff_factor=0.25,
+    status_forcelist=[429, 500, 502, 503, 504],
+)
+
+
+def _new_session() -> requests.Session:
+    session = requests.Session()
+
+    # One host; at most two fetches in flight (4H + 1D via market_data)
+    session.mount(
+        "https://",
+        HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=_RETRY),
+    )
+    return session
+
+
+# One pooled session per process: repeated fetches reuse the open
+# TLS connection to Kraken instead of re-handshaking on every call.
+_SESSION = _new_session()
+_SESSION_LOCK = threading.Lock()
+
+
+def _get(url: str, params: dict) -> requests.Response:
+    global _SESSION
+
+    session = _SESSION
+    try:
+        return session.get(url, params=params, timeout=TIMEOUT)
+    except requests.exceptions.ConnectionError:
+        # Likely a stale pooled socket (e.g. reset by peer): rebuild the
+        # session and try once more. Fetches run concurrently, so only
+        # the first thread to fail replaces it; others reuse the new one.
+        # The old session is not closed here — another thread may still
+        # have a request in flight on it; it is freed once unreferenced.
+        with _SESSION_LOCK:
+            if _SESSION is session:
+                _SESSION = _new_session()
+            session = _SESSION
+        return session.get(url, params=params, timeout=TIMEOUT)
+
 
 # Kraken interval mapping
 INTERVAL_4H = 240   # minutes
 INTERVAL_1D = 1440  # minutes
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Candle:
     time: int
     open: float
@@ -30,24 +92,92 @@ class Candle:
     close: float
 
 
-def fetch_kraken_candles(interval_minutes: int, lookback_days: int) -> List[Candle]:
+@dataclass(slots=True)
+class OHLCBatch:
+    """
+    Candles stored column-wise, oldest first.
+
+    One contiguous array per field instead of one object per candle,
+    so gates can slice and reduce a column directly.
     """
-    Fetch OHLC candles from Kraken.
+
+    time: array   # int64 open times
+    open: array   # float64
+    high: array   # float64
+    low: array    # float64
+    close: array  # float64
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __getitem__(self, index: slice) -> "OHLCBatch":
+        return OHLCBatch(
+            time=self.time[index],
+            open=self.open[index],
+            high=self.high[index],
+            low=self.low[index],
+            close=self.close[index],
+        )
+
+    def __add__(self, other: "OHLCBatch") -> "OHLCBatch":
+        return OHLCBatch(
+            time=self.time + other.time,
+            open=self.open + other.open,
+            high=self.high + other.high,
+            low=self.low + other.low,
+            close=self.close + other.close,
+        )
+
+    @classmethod
+    def from_rows(cls, rows) -> "OHLCBatch":
+        """
+        Build from (time, open, high, low, close) tuples.
+        """
+
+        columns = list(zip(*rows)) or [()] * 5
+        return cls(
+            time=array("q", columns[0]),
+            open=array("d", columns[1]),
+            high=array("d", columns[2]),
+            low=array("d", columns[3]),
+            close=array("d", columns[4]),
+        )
+
+    def rows(self):
+        return zip(self.time, self.open, self.high, self.low, self.close)
+
+    def candles(self) -> List[Candle]:
+        return [
+            Candle(time=t, open=o, high=h, low=l, close=c)
+            for t, o, h, l, c in self.rows()
+        ]
+
+
+@lru_cache(maxsize=16)
+def _ohlc_url(pair: str, interval_minutes: int) -> str:
+    # Fixed part of the query, built once per pair/interval
+    return f"{KRAKEN_URL}?pair={pair}&interval={interval_minutes}"
+
+
+def fetch_kraken_batch(interval_minutes: int, lookback_days: int) -> OHLCBatch:
+    """
+    Fetch OHLC candles from Kraken as column arrays.
 
     interval_minutes:
         240  = 4H
         1440 = 1D
+
+    Closed candles are served from the local cache; only bars newer
+    than the last cached one are requested.
     """
 
     since = int(time.time()) - lookback_days * 86400
 
-    params = {
-        "pair": "XBTUSD",
-        "interval": interval_minutes,
-        "since": since,
-    }
+    cached = OHLCBatch.from_rows(cache.load(KRAKEN_PAIR, interval_minutes, since))
 
-    r = requests.get(KRAKEN_URL, params=params, timeout=10)
+    params = {"since": cached.time[-1] if len(cached) else since}
+
+    r = _get(_ohlc_url(KRAKEN_PAIR, interval_minutes), params)
     r.raise_for_status()
 
     data = r.json()
@@ -58,31 +188,59 @@ def fetch_kraken_candles(interval_minutes: int, lookback_days: int) -> List[Cand
     # Kraken returns a dict keyed by pair name
     ohlc = next(iter(data["result"].values()))
 
-    candles: List[Candle] = []
-
-    for row in ohlc:
-        candles.append(
-            Candle(
-                time=int(row[0]),
-                open=float(row[1]),
-                high=float(row[2]),
-                low=float(row[3]),
-                close=float(row[4]),
-            )
-        )
+    # Transpose once and cast whole columns straight into the arrays;
+    # no per-row objects. Only the schema fields are kept —
+    # vwap/volume/count are dropped before the transpose.
+    columns = list(zip(*map(_KRAKEN_ROW, ohlc))) or [()] * 5
+    fetched = OHLCBatch(
+        time=array("q", map(int, columns[0])),
+        open=array("d", map(float, columns[1])),
+        high=array("d", map(float, columns[2])),
+        low=array("d", map(float, columns[3])),
+        close=array("d", map(float, columns[4])),
+    )
 
-    return candles
+    # The last entry is the still-forming candle — never cache it
+    cache.save(KRAKEN_PAIR, interval_minutes, fetched[:-1].rows())
 
+    # Merge on open time: cached bars before the first fetched one,
+    # then the fetched bars (a re-sent bar replaces its cached copy)
+    if len(fetched):
+        cached = cached[:bisect_left(cached.time, fetched.time[0])]
+    merged = cached + fetched
 
-# Compatibility wrapper (keeps gates unchanged)
-def fetch_coinbase_candles(granularity: int, lookback_days: int) -> List[Candle]:
+    return merged[bisect_right(merged.time, since):]
+
+
+def fetch_kraken_candles(interval_minutes: int, lookback_days: int) -> List[Candle]:
     """
-    Compatibility shim so range_gate / trend_gate do not change.
+    Fetch OHLC candles from Kraken as Candle objects.
     """
 
+    return fetch_kraken_batch(interval_minutes, lookback_days).candles()
+
+
+# Compatibility wrappers (keep gates unchanged)
+def _kraken_interval(granularity: int) -> int:
     if granularity == 14400:
-        return fetch_kraken_candles(INTERVAL_4H, lookback_days)
+        return INTERVAL_4H
     elif granularity == 86400:
-        return fetch_kraken_candles(INTERVAL_1D, lookback_days)
+        return INTERVAL_1D
     else:
-        raise ValueError("Unsupported granularity")
\ No newline at end of file
+        raise ValueError("Unsupported granularity")
+
+
+def fetch_coinbase_candles(granularity: int, lookback_days: int) -> List[Candle]:
+    """
+    Compatibility shim so range_gate / trend_gate do not change.
+    """
+
+    return fetch_kraken_candles(_kraken_interval(granularity), lookback_days)
+
+
+def fetch_coinbase_batch(granularity: int, lookback_days: int) -> OHLCBatch:
+    """
+    Column-wise variant of fetch_coinbase_candles.
+    """
+
+    return fetch_kraken_batch(_kraken_interval(granularity), lookback_days)
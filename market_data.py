@@ -0,0 +1,31 @@
+# market_data.py
+"""
+Market data loader for the regime engine.
+
+Fetches every OHLC series the gates need once, concurrently, and hands
+the column-wise batches to each gate so no gate fetches on its own.
+
+Each gate still owns its timeframe and lookback via its fetch function.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable
+
+import range_gate
+import trend_gate
+from data_source import OHLCBatch
+
+
+FETCHERS = {
+    "4h": range_gate.fetch_candles,
+    "1d": trend_gate.fetch_daily_candles,
+}
+
+
+def load(intervals: Iterable[str] = ("4h", "1d")) -> Dict[str, OHLCBatch]:
+    intervals = list(intervals)
+
+    # Independent endpoints — overlap the network waits
+    with ThreadPoolExecutor(max_workers=len(intervals)) as pool:
+        futures = {i: pool.submit(FETCHERS[i]) for i in intervals}
+        return {i: f.result() for i, f in futures.items()}
@@ -11,38 +11,57 @@ Uses Coinbase public OHLC data (US-safe).
 This module performs NO trading.
 """
 
-from dataclasses import dataclass
-from typing import List, Tuple
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
 
 import config
-from data_source import Candle, fetch_coinbase_candles
+from data_source import OHLCBatch, fetch_coinbase_batch
+
+__all__ = [
+    "RangeDecision",
+    "fetch_candles",
+    "evaluate_window",
+    "fast_evaluate_window",
+    "decide_range",
+    "range_gate_decision",
+]
 
 
 # ============================================================
-# Data structures
+# Derived constants (config is locked — compute once at import)
 # ============================================================
 
-@dataclass
-class RangeDecision:
-    decision: str
-    reasons: List[str]
+_UPPER_NEAR_MULT = 1 - config.PROXIMITY_PCT / 100
+_LOWER_NEAR_MULT = 1 + config.PROXIMITY_PCT / 100
+_RECENT_N = config.CANDLES_PER_DAY * 2  # last ~2 days
+
+_MIN_WIDTH_PCT = config.MIN_RANGE_WIDTH_PCT
+_MIN_INSIDE_PCT = config.MIN_CLOSES_INSIDE_PCT
+_MIN_REJECTIONS = config.MIN_REJECTIONS
+_MIN_BOUNCES = config.MIN_BOUNCES
+_MAX_RECENT_MOVE_PCT = config.TREND_EXPANSION_PCT
 
 
 # ============================================================
-# Helpers
+# Data structures
 # ============================================================
 
-def percent_change(a: float, b: float) -> float:
-    return (a - b) / b * 100.0
+@dataclass(slots=True)
+class RangeDecision:
+    decision: str
+    reasons: List[str]
+    window_days: Optional[int] = None   # set only when a range is valid
+    metrics: Dict[str, float] = field(default_factory=dict)
 
 
 # ============================================================
 # Data fetch (4H candles from Coinbase)
 # ============================================================
 
-def fetch_candles() -> List[Candle]:
+def fetch_candles() -> OHLCBatch:
     # 4H candles, ~10–13 days buffer
-    return fetch_coinbase_candles(
+    return fetch_coinbase_batch(
         granularity=14400,
         lookback_days=14
     )
@@ -52,73 +71,134 @@ def fetch_candles() -> List[Candle]:
 # Core evaluation logic
 # ============================================================
 
-def evaluate_window(candles: List[Candle], days: int) -> Tuple[bool, List[str]]:
-    reasons: List[str] = []
+def _scan(
+    highs, lows, closes,
+    upper: Optional[float] = None,
+    lower: Optional[float] = None,
+) -> Tuple[float, float, int, int, int, float]:
+    """
+    Numeric kernel for one window.
+
+    Returns (upper, lower, inside, upper_rejections, lower_bounces, net_move).
+    Pass upper/lower when the window extrema are already known.
+    """
+
+    if upper is None:
+        upper = max(highs)
+    if lower is None:
+        lower = min(lows)
+
+    upper_near = upper * _UPPER_NEAR_MULT
+    lower_near = lower * _LOWER_NEAR_MULT
+
+    # One pass over the window for all three counts. Predicates are
+    # combined with `&` (no short-circuit) so each bar costs the same
+    # straight-line comparisons.
+    inside = upper_rejections = lower_bounces = 0
+    for h, l, c in zip(highs, lows, closes):
+        inside += (c >= lower) & (c <= upper)
+        upper_rejections += (h >= upper_near) & (c >= upper_near) & (c < upper)
+        lower_bounces += (l <= lower_near) & (c > lower) & (c <= lower_near)
+
+    # Net move over the last ~2 days: two index reads, no slice
+    then = closes[-_RECENT_N]
+    net_move = abs((closes[-1] - then) / then * 100.0)
+
+    return upper, lower, inside, upper_rejections, lower_bounces, net_move
+
+
+# Keys: upper, lower, range_width_pct, closes_inside_pct,
+# upper_rejections, lower_bounces, recent_move_pct
+WindowMetrics = Dict[str, float]
+
+# One line per diagnostic, filled from a WindowMetrics dict
+_DIAG_TEMPLATE = (
+    "Range width: {range_width_pct:.2f}%\n"
+    "Closes inside: {closes_inside_pct:.1f}%\n"
+    "Upper rejections: {upper_rejections}\n"
+    "Lower bounces: {lower_bounces}\n"
+    "Recent 2d move: {recent_move_pct:.2f}%"
+)
+
+
+def _window_metrics(
+    candles: OHLCBatch,
+    days: int,
+    extrema: Optional[Tuple[float, float]] = None,
+) -> WindowMetrics:
+    """
+    Numbers behind every rule for one window — no formatting.
+    """
 
     needed = days * config.CANDLES_PER_DAY
-    window = candles[-needed:]
+    closes = candles.close[-needed:]
 
-    highs = [c.high for c in window]
-    lows = [c.low for c in window]
-    closes = [c.close for c in window]
+    upper, lower = extrema if extrema is not None else (None, None)
+    upper, lower, inside, upper_rejections, lower_bounces, net_move = _scan(
+        candles.high[-needed:], candles.low[-needed:], closes, upper, lower
+    )
+
+    return {
+        "upper": upper,
+        "lower": lower,
+        "range_width_pct": (upper - lower) / lower * 100.0,
+        "closes_inside_pct": inside / len(closes) * 100.0,
+        "upper_rejections": upper_rejections,
+        "lower_bounces": lower_bounces,
+        "recent_move_pct": net_move,
+    }
+
+
+def _passes(metrics: WindowMetrics) -> bool:
+    return (
+        metrics["range_width_pct"] >= _MIN_WIDTH_PCT
+        and metrics["closes_inside_pct"] >= _MIN_INSIDE_PCT
+        and metrics["upper_rejections"] >= _MIN_REJECTIONS
+        and metrics["lower_bounces"] >= _MIN_BOUNCES
+        and metrics["recent_move_pct"] <= _MAX_RECENT_MOVE_PCT
+    )
 
-    upper = max(highs)
-    lower = min(lows)
+
+def _describe(metrics: WindowMetrics) -> Tuple[bool, List[str]]:
+    range_width_pct = metrics["range_width_pct"]
+    inside_pct = metrics["closes_inside_pct"]
+    upper_rejections = metrics["upper_rejections"]
+    lower_bounces = metrics["lower_bounces"]
+    net_move = metrics["recent_move_pct"]
+
+    reasons: List[str] = []
 
     # Rule 5 — Range width
-    range_width_pct = (upper - lower) / lower * 100.0
-    if range_width_pct < config.MIN_RANGE_WIDTH_PCT:
+    if range_width_pct < _MIN_WIDTH_PCT:
         reasons.append(
-            f"Range width {range_width_pct:.2f}% < {config.MIN_RANGE_WIDTH_PCT}%"
+            f"Range width {range_width_pct:.2f}% < {_MIN_WIDTH_PCT}%"
         )
 
     # Rule 4 — Closes inside range
-    inside = sum(1 for c in window if lower <= c.close <= upper)
-    inside_pct = inside / len(window) * 100.0
-    if inside_pct < config.MIN_CLOSES_INSIDE_PCT:
+    if inside_pct < _MIN_INSIDE_PCT:
         reasons.append(
-            f"Closes inside range {inside_pct:.1f}% < {config.MIN_CLOSES_INSIDE_PCT}%"
+            f"Closes inside range {inside_pct:.1f}% < {_MIN_INSIDE_PCT}%"
         )
 
     # Rule 2 — Upper boundary rejections
-    upper_near = upper * (1 - config.PROXIMITY_PCT / 100)
-    upper_rejections = sum(
-        1 for c in window
-        if c.high >= upper_near and c.close < upper and c.close >= upper_near
-    )
-    if upper_rejections < config.MIN_REJECTIONS:
+    if upper_rejections < _MIN_REJECTIONS:
         reasons.append(
-            f"Upper rejections {upper_rejections} < {config.MIN_REJECTIONS}"
+            f"Upper rejections {upper_rejections} < {_MIN_REJECTIONS}"
         )
 
     # Rule 3 — Lower boundary bounces
-    lower_near = lower * (1 + config.PROXIMITY_PCT / 100)
-    lower_bounces = sum(
-        1 for c in window
-        if c.low <= lower_near and c.close > lower and c.close <= lower_near
-    )
-    if lower_bounces < config.MIN_BOUNCES:
+    if lower_bounces < _MIN_BOUNCES:
         reasons.append(
-            f"Lower bounces {lower_bounces} < {config.MIN_BOUNCES}"
+            f"Lower bounces {lower_bounces} < {_MIN_BOUNCES}"
         )
 
     # Rule 6 — No recent directional expansion
-    recent = window[-config.CANDLES_PER_DAY * 2:]  # last ~2 days
-    net_move = abs(
-        percent_change(recent[-1].close, recent[0].close)
-    )
-    if net_move > config.TREND_EXPANSION_PCT:
+    if net_move > _MAX_RECENT_MOVE_PCT:
         reasons.append(
-            f"Recent 2d move {net_move:.2f}% > {config.TREND_EXPANSION_PCT}%"
+            f"Recent 2d move {net_move:.2f}% > {_MAX_RECENT_MOVE_PCT}%"
         )
 
-    diagnostics = [
-        f"Range width: {range_width_pct:.2f}%",
-        f"Closes inside: {inside_pct:.1f}%",
-        f"Upper rejections: {upper_rejections}",
-        f"Lower bounces: {lower_bounces}",
-        f"Recent 2d move: {net_move:.2f}%",
-    ]
+    diagnostics = _DIAG_TEMPLATE.format_map(metrics).splitlines()
 
     if reasons:
         return False, diagnostics + ["FAILURES:"] + reasons
@@ -126,13 +206,79 @@ def evaluate_window(candles: List[Candle], days: int) -> Tuple[bool, List[str]]:
     return True, diagnostics
 
 
+def evaluate_window(
+    candles: OHLCBatch,
+    days: int,
+    extrema: Optional[Tuple[float, float]] = None,
+) -> Tuple[bool, List[str]]:
+    return _describe(_window_metrics(candles, days, extrema))
+
+
+def fast_evaluate_window(
+    candles: OHLCBatch,
+    days: int,
+    extrema: Optional[Tuple[float, float]] = None,
+) -> bool:
+    """
+    Same verdict as evaluate_window, without building any strings.
+    For repeated evaluation (e.g. replaying history).
+    """
+
+    return _passes(_window_metrics(candles, days, extrema))
+
+
 # ============================================================
 # Public decision function
 # ============================================================
 
-def range_gate_decision() -> RangeDecision:
-    candles = fetch_candles()
+# Decisions already made for a given bar, keyed by _bar_key.
+# Closed bars never change, so a repeat call within the same 4H bar
+# (with the forming bar unchanged) returns the stored decision.
+_DECISION_CACHE: Dict[Tuple, RangeDecision] = {}
+_DECISION_CACHE_SIZE = 8
+
+
+def _bar_key(candles: OHLCBatch) -> Tuple:
+    widest = config.LOOKBACK_DAYS_MAX * config.CANDLES_PER_DAY
+    if len(candles) < widest:
+        # Too short for any window: the decision depends on nothing else
+        return (len(candles),)
+
+    # Batch length + span of the widest window (its first bar, the last
+    # closed bar) + the still-forming bar's prices
+    return (
+        len(candles),
+        candles.time[-widest],
+        candles.time[-2],
+        candles.time[-1],
+        candles.high[-1],
+        candles.low[-1],
+        candles.close[-1],
+    )
+
 
+def range_gate_decision(batch: Optional[OHLCBatch] = None) -> RangeDecision:
+    """
+    Pass `batch` (4H candles) to reuse data already loaded by the caller;
+    otherwise the candles are fetched here.
+    """
+
+    candles = batch if batch is not None else fetch_candles()
+
+    key = _bar_key(candles)
+    decision = _DECISION_CACHE.get(key)
+
+    if decision is None:
+        decision = decide_range(candles)
+
+        if len(_DECISION_CACHE) >= _DECISION_CACHE_SIZE:
+            _DECISION_CACHE.pop(next(iter(_DECISION_CACHE)))
+        _DECISION_CACHE[key] = decision
+
+    return decision
+
+
+def decide_range(candles: OHLCBatch) -> RangeDecision:
     min_needed = config.LOOKBACK_DAYS_MAX * config.CANDLES_PER_DAY
     if len(candles) < min_needed:
         return RangeDecision(
@@ -140,22 +286,34 @@ def range_gate_decision() -> RangeDecision:
             ["Insufficient candle data"]
         )
 
-    last_diagnostics: List[str] = []
+    # Running extrema from the newest bar backwards: entry n-1 is the
+    # high/low of the last n bars, so each window size reads its
+    # boundaries in O(1) instead of rescanning.
+    upper_by_len = list(accumulate(reversed(candles.high[-min_needed:]), max))
+    lower_by_len = list(accumulate(reversed(candles.low[-min_needed:]), min))
 
+    # Only the window that is reported gets its diagnostics formatted
     for days in range(config.LOOKBACK_DAYS_MIN, config.LOOKBACK_DAYS_MAX + 1):
-        valid, diagnostics = evaluate_window(candles, days)
+        n = days * config.CANDLES_PER_DAY
+        metrics = _window_metrics(
+            candles, days, (upper_by_len[n - 1], lower_by_len[n - 1])
+        )
 
-        if valid:
+        if _passes(metrics):
+            _, diagnostics = _describe(metrics)
             return RangeDecision(
                 "RANGE VALID",
-                [f"Valid {days}-day range detected"] + diagnostics
+                [f"Valid {days}-day range detected"] + diagnostics,
+                window_days=days,
+                metrics=metrics,
             )
 
-        last_diagnostics = diagnostics
+    _, last_diagnostics = _describe(metrics)
 
     return RangeDecision(
         "NO RANGE",
-        [f"Window checked: {days} days"] + last_diagnostics
+        [f"Window checked: {days} days"] + last_diagnostics,
+        metrics=metrics,
     )
 
 
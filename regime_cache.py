@@ -0,0 +1,45 @@
+# regime_cache.py
+"""
+Same-day cache for regime decisions.
+
+The regime is decided on daily structure, so a decision already made
+today under the same rules is replayed instead of re-fetching and
+re-evaluating. Entries are plain JSON files; invalidation is by age.
+"""
+
+import json
+import os
+import time
+from typing import Optional
+
+CACHE_DIR = ".cache"
+
+
+def load(path: str, max_age_s: float) -> Optional[dict]:
+    """
+    Return the cached object, or None if missing, stale or unreadable.
+    """
+
+    try:
+        age = time.time() - os.path.getmtime(path)
+    except OSError:
+        return None
+
+    if age > max_age_s:
+        return None
+
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def store(path: str, obj: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    # Write-then-rename so a reader never sees a half-written file
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
@@ -3,15 +3,21 @@ regime_engine.py
 
 Daily Regime Decision Engine — Research Logging v2 (Robust)
 
-This version adapts to the *actual* RangeDecision fields
-without modifying range_gate.py.
+Range diagnostics are read from RangeDecision.metrics, the same
+structured numbers the range gate decided on.
 """
 
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
-import csv
+from typing import Optional
+import hashlib
 import os
 
+import config
+import csv_log
+import market_data
 import range_gate
+import regime_cache
 import trend_gate
 
 
@@ -52,26 +58,66 @@ CSV_HEADER = [
 ]
 
 
-def ensure_log_file():
-    if not os.path.isfile(REGIME_LOG_FILE):
-        with open(REGIME_LOG_FILE, "w", newline="") as f:
-            csv.writer(f).writerow(CSV_HEADER)
+class RegimeLogger(csv_log.CSVLog):
+    """
+    Regime decision log, kept open for the life of the process.
 
+    Rows are handed to a background writer, so logging never waits
+    on file I/O.
+    """
 
-def decide_regime_and_log():
-    timestamp = datetime.now(timezone.utc).isoformat()
-    ensure_log_file()
+    def __init__(self, path: str = REGIME_LOG_FILE):
+        super().__init__(path, CSV_HEADER)
+
+
+_LOGGER = None
+
+
+def get_logger() -> RegimeLogger:
+    global _LOGGER
+    if _LOGGER is None:
+        _LOGGER = RegimeLogger()
+    return _LOGGER
+
+
+# ============================================================
+# Decision
+# ============================================================
+
+@dataclass(slots=True)
+class RegimeDecision:
+    strategy: str
+    regime: str
+
+    range_decision: str
+    range_window_days: Optional[int]
+    range_metrics: dict
+
+    trend_decision: str
+    trend_direction: Optional[str]
+    trend_diagnostics: dict
+
+    range_readiness_state: str
+    trend_readiness_state: str
+
+    # Stamped once when decided; a cache replay keeps the original time
+    timestamp_utc: str = field(
+        default_factory=lambda: datetime.now(timezone.utc).isoformat()
+    )
+
+
+def decide_regime() -> RegimeDecision:
+
+    # ---------------- DATA FETCH ----------------
+
+    data = market_data.load()
 
     # ---------------- RANGE GATE ----------------
 
-    range_result = range_gate.range_gate_decision()
+    range_result = range_gate.range_gate_decision(batch=data["4h"])
 
     range_decision = range_result.decision
-    window_days = getattr(range_result, "window_days", None)
-    range_width_pct = getattr(range_result, "range_width_pct", None)
-    closes_inside_pct = getattr(range_result, "closes_inside_pct", None)
-    upper_tests = getattr(range_result, "upper_rejections", None)
-    lower_tests = getattr(range_result, "lower_bounces", None)
+    window_days = range_result.window_days
 
     if range_decision == "RANGE VALID":
         range_readiness_state = "RANGE_READY"
@@ -82,8 +128,7 @@ def decide_regime_and_log():
 
     # ---------------- TREND GATE ----------------
 
-    candles = trend_gate.fetch_daily_candles()
-    trend_result = trend_gate.evaluate_trend(candles)
+    trend_result = trend_gate.trend_gate_decision(batch=data["1d"])
     td = trend_result.diagnostics
 
     if trend_result.decision == "TREND CONFIRMED":
@@ -107,27 +152,54 @@ def decide_regime_and_log():
         strategy = "NO ACTIVE STRATEGY"
         regime = "DRIFT / TRANSITION"
 
-    # ---------------- OUTPUT ----------------
-
-    print(f"\nStrategy: {strategy}")
-    print(f"Regime: {regime}")
-    trend_gate.print_trend_progress(trend_result)
-
-    # ---------------- LOG ROW ----------------
+    return RegimeDecision(
+        strategy=strategy,
+        regime=regime,
+        range_decision=range_decision,
+        range_window_days=window_days,
+        range_metrics=range_result.metrics,
+        trend_decision=trend_result.decision,
+        trend_direction=trend_result.direction,
+        trend_diagnostics=td,
+        range_readiness_state=range_readiness_state,
+        trend_readiness_state=trend_readiness_state,
+    )
+
+
+# ============================================================
+# Output + logging
+# ============================================================
+
+def print_decision(decision: RegimeDecision):
+    print(f"\nStrategy: {decision.strategy}")
+    print(f"Regime: {decision.regime}")
+    trend_gate.print_trend_progress(
+        trend_gate.TrendDecision(
+            decision=decision.trend_decision,
+            direction=decision.trend_direction,
+            reasons=[],
+            diagnostics=decision.trend_diagnostics,
+        )
+    )
+
+
+def log_decision(decision: RegimeDecision):
+    rm = decision.range_metrics
+    td = decision.trend_diagnostics
 
     row = [
-        timestamp,
-        strategy,
-        regime,
-
-        range_decision,
-        window_days,
-        range_width_pct,
-        closes_inside_pct,
-        upper_tests,
-        lower_tests,
-
-        trend_result.decision,
+        decision.timestamp_utc,
+        decision.strategy,
+        decision.regime,
+
+        decision.range_decision,
+        decision.range_window_days,
+        rm.get("range_width_pct"),
+        rm.get("closes_inside_pct"),
+        rm.get("upper_rejections"),
+        rm.get("lower_bounces"),
+
+        decision.trend_decision,
         td.get("direction"),
         td.get("price_then"),
         td.get("price_now"),
@@ -136,17 +208,59 @@ def decide_regime_and_log():
         td.get("pullback_observed"),
         td.get("pullback_failed"),
 
-        range_readiness_state,
-        trend_readiness_state,
+        decision.range_readiness_state,
+        decision.trend_readiness_state,
 
         "",
         "",
         "",
     ]
 
-    with open(REGIME_LOG_FILE, "a", newline="") as f:
-        csv.writer(f).writerow(row)
+    get_logger().log(row)
+
+
+# ============================================================
+# Same-day cache
+# ============================================================
+
+def _rules_fingerprint() -> str:
+    # Stable across processes (unlike hash()), so the cache survives reruns
+    rules = sorted(
+        (f"{module.__name__}.{name}", value)
+        for module in (config, trend_gate)
+        for name, value in vars(module).items()
+        if name.isupper()
+    )
+    return hashlib.sha1(repr(rules).encode()).hexdigest()[:12]
+
+
+def _cache_path(day) -> str:
+    return os.path.join(
+        regime_cache.CACHE_DIR,
+        f"regime_{day.isoformat()}_{_rules_fingerprint()}.json",
+    )
+
+
+def decide_regime_and_log():
+    now = datetime.now(timezone.utc)
+
+    # Valid until the next UTC midnight; already decided today → replay
+    path = _cache_path(now.date())
+    since_midnight = (
+        now - now.replace(hour=0, minute=0, second=0, microsecond=0)
+    ).total_seconds()
+
+    cached = regime_cache.load(path, max_age_s=since_midnight)
+    if cached is not None:
+        print_decision(RegimeDecision(**cached))
+        return
+
+    decision = decide_regime()
+    regime_cache.store(path, asdict(decision))
+
+    print_decision(decision)
+    log_decision(decision)
 
 
 if __name__ == "__main__":
-    decide_regime_and_log()
\ No newline at end of file
+    decide_regime_and_log()
@@ -0,0 +1,42 @@
+# test_range_gate.py
+import unittest
+
+import config
+import range_gate
+from data_source import OHLCBatch
+
+BAR_SECONDS = 4 * 3600
+WIDEST = config.LOOKBACK_DAYS_MAX * config.CANDLES_PER_DAY
+
+
+def _batch(n: int) -> OHLCBatch:
+    # Flat, narrow market: long enough to evaluate, never a valid range
+    return OHLCBatch.from_rows(
+        (i * BAR_SECONDS, 100.0, 100.1, 99.9, 100.0) for i in range(n)
+    )
+
+
+class DecisionMemoTest(unittest.TestCase):
+    def setUp(self):
+        range_gate._DECISION_CACHE.clear()
+
+    def test_same_tail_different_length_is_not_shared(self):
+        full = _batch(WIDEST + 20)
+        short = full[-30:]
+
+        # Identical last closed bar and forming bar
+        self.assertEqual(short.time[-2:], full.time[-2:])
+
+        short_decision = range_gate.range_gate_decision(batch=short)
+        full_decision = range_gate.range_gate_decision(batch=full)
+
+        self.assertEqual(short_decision.reasons, ["Insufficient candle data"])
+        self.assertEqual(
+            full_decision.reasons[0],
+            f"Window checked: {config.LOOKBACK_DAYS_MAX} days",
+        )
+        self.assertEqual(full_decision, range_gate.decide_range(full))
+
+
+if __name__ == "__main__":
+    unittest.main()
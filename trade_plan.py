@@ -8,11 +8,11 @@ Purpose:
 - No execution, no signals
 """
 
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from datetime import datetime, timezone
-import csv
-import os
+from operator import itemgetter
 
+import csv_log
 from range_gate import RangeDecision
 from trend_gate import TrendDecision
 
@@ -24,11 +24,12 @@ TRADE_LOG_FILE = "trade_plan_log.csv"
 # -----------------------------
 
 def generate_range_trade_plan(range_decision: RangeDecision) -> Dict:
-    L = range_decision.lower
-    U = range_decision.upper
+    L = range_decision.metrics["lower"]
+    U = range_decision.metrics["upper"]
     W = U - L
 
     plan = {
+        "timestamp_utc": datetime.now(timezone.utc).isoformat(),
         "strategy": "RANGE TRADING",
         "regime": "RANGE",
         "range_lower": L,
@@ -54,6 +55,7 @@ def generate_trend_trade_plan(trend_decision: TrendDecision) -> Dict:
     R = H - O
 
     plan = {
+        "timestamp_utc": datetime.now(timezone.utc).isoformat(),
         "strategy": "TREND PULLBACK",
         "regime": "TREND_UP",
         "trend_origin": O,
@@ -72,45 +74,68 @@ def generate_trend_trade_plan(trend_decision: TrendDecision) -> Dict:
 # LOGGING
 # -----------------------------
 
+TRADE_CSV_HEADER = [
+    "timestamp_utc",
+    "regime",
+    "strategy",
+    "spot_price",
+    "range_lower",
+    "range_upper",
+    "entry_zone_low",
+    "entry_zone_high",
+    "pullback_zone_low",
+    "pullback_zone_high",
+    "invalidation",
+    "tp1",
+    "tp2",
+    "target",
+    "notes",
+]
+
+# Opened on first use and kept for the life of the process
+_LOG = None
+
+
+def _log() -> csv_log.CSVLog:
+    global _LOG
+    if _LOG is None:
+        _LOG = csv_log.CSVLog(TRADE_LOG_FILE, TRADE_CSV_HEADER)
+    return _LOG
+
+
+# Plan keys in CSV column order (timestamp and spot price are filled
+# separately). Range and trend plans each lack some keys; _DEFAULTS
+# supplies None for those.
+_PLAN_FIELDS = tuple(
+    name for name in TRADE_CSV_HEADER
+    if name not in ("timestamp_utc", "spot_price")
+)
+_PLAN_GETTER = itemgetter(*_PLAN_FIELDS)
+_DEFAULTS = dict.fromkeys(_PLAN_FIELDS)
+
+
+def _plan_row(plan: Dict, spot_price: float) -> Tuple:
+    values = _PLAN_GETTER({**_DEFAULTS, **plan})
+
+    # Plans carry the time they were generated; only hand-built
+    # plans without one fall back to the time of logging.
+    return (
+        plan.get("timestamp_utc") or datetime.now(timezone.utc).isoformat(),
+        *values[:2],            # regime, strategy
+        f"{spot_price:.2f}",
+        *values[2:],
+    )
+
+
+def log_trade_plans(plans: List[Tuple[Dict, float]]):
+    """
+    Queue several (plan, spot_price) pairs for the background writer.
+    """
+
+    _log().log_rows(
+        _plan_row(plan, spot_price) for plan, spot_price in plans
+    )
+
+
 def log_trade_plan(plan: Dict, spot_price: float):
-    file_exists = os.path.isfile(TRADE_LOG_FILE)
-
-    with open(TRADE_LOG_FILE, mode="a", newline="") as f:
-        writer = csv.writer(f)
-
-        if not file_exists:
-            writer.writerow([
-                "timestamp_utc",
-                "regime",
-                "strategy",
-                "spot_price",
-                "range_lower",
-                "range_upper",
-                "entry_zone_low",
-                "entry_zone_high",
-                "pullback_zone_low",
-                "pullback_zone_high",
-                "invalidation",
-                "tp1",
-                "tp2",
-                "target",
-                "notes",
-            ])
-
-        writer.writerow([
-            datetime.now(timezone.utc).isoformat(),
-            plan.get("regime"),
-            plan.get("strategy"),
-            f"{spot_price:.2f}",
-            plan.get("range_lower"),
-            plan.get("range_upper"),
-            plan.get("entry_zone_low"),
-            plan.get("entry_zone_high"),
-            plan.get("pullback_zone_low"),
-            plan.get("pullback_zone_high"),
-            plan.get("invalidation"),
-            plan.get("tp1"),
-            plan.get("tp2"),
-            plan.get("target"),
-            plan.get("notes"),
-        ])
\ No newline at end of file
+    log_trade_plans([(plan, spot_price)])
@@ -18,8 +18,19 @@ Uses:
 from dataclasses import dataclass
 from typing import List, Optional
 from datetime import datetime, timezone
+from itertools import compress
+from math import fabs
+from operator import gt, lt
 
-from data_source import Candle, fetch_coinbase_candles
+from data_source import OHLCBatch, fetch_coinbase_batch
+
+__all__ = [
+    "TrendDecision",
+    "fetch_daily_candles",
+    "evaluate_trend",
+    "trend_gate_decision",
+    "print_trend_progress",
+]
 
 
 # ============================================================
@@ -31,12 +42,20 @@ MIN_NET_MOVE_PCT = 4.0         # Minimum expansion to prove intent
 MIN_DIRECTIONAL_CLOSES = 5     # Consistency check
 MAX_RETRACE_PCT = 50.0         # Disqualify deep structural damage
 
+# Same thresholds as plain ratios, so checks skip the *100 per call
+MIN_NET_MOVE_RATIO = MIN_NET_MOVE_PCT / 100.0
+MAX_RETRACE_RATIO = MAX_RETRACE_PCT / 100.0
+
+# Pullback status bits returned by the evaluation kernel
+_PULLBACK_OBSERVED = 1
+_PULLBACK_FAILED = 2
+
 
 # ============================================================
 # Data structures
 # ============================================================
 
-@dataclass
+@dataclass(slots=True)
 class TrendDecision:
     decision: str
     direction: Optional[str]
@@ -44,20 +63,14 @@ class TrendDecision:
     diagnostics: dict
 
 
-# ============================================================
-# Helpers
-# ============================================================
-
-def percent_change(a: float, b: float) -> float:
-    return (a - b) / b * 100.0
-
-
 # ============================================================
 # Data fetch
 # ============================================================
 
-def fetch_daily_candles() -> List[Candle]:
-    return fetch_coinbase_candles(
+def fetch_daily_candles() -> OHLCBatch:
+    # Closed bars come from the local OHLC cache; the forming daily bar
+    # is always refetched, so price_now stays current
+    return fetch_coinbase_batch(
         granularity=86400,
         lookback_days=30
     )
@@ -67,85 +80,101 @@ def fetch_daily_candles() -> List[Candle]:
 # Core evaluation
 # ============================================================
 
-def evaluate_trend(candles: List[Candle]) -> TrendDecision:
-    if len(candles) < LOOKBACK_DAYS + 1:
-        return TrendDecision(
-            decision="NO TREND",
-            direction=None,
-            reasons=["Insufficient daily data"],
-            diagnostics={}
-        )
+def _trend_kernel(close, high, low, min_move, min_closes, max_retrace):
+    """
+    Numeric kernel over one window's close/high/low columns.
 
-    window = candles[-LOOKBACK_DAYS:]
-    start_price = window[0].close
-    end_price = window[-1].close
+    Returns (confirmed, direction_up, net_move_ratio, directional_closes,
+    pullback_status) — numbers and flags only. pullback_status is a
+    bit set of _PULLBACK_OBSERVED / _PULLBACK_FAILED.
+    """
 
-    net_move_pct = percent_change(end_price, start_price)
-    direction = "UP" if net_move_pct > 0 else "DOWN"
+    origin = close[0]
+    net_move_ratio = (close[-1] - origin) / origin
+    direction_up = net_move_ratio > 0
 
     # --------------------------------------------------------
-    # Directional closes
+    # Directional closes + pullbacks (day-over-day, whole column)
     # --------------------------------------------------------
 
-    directional_closes = 0
-    for i in range(1, len(window)):
-        if direction == "UP" and window[i].close > window[i - 1].close:
-            directional_closes += 1
-        if direction == "DOWN" and window[i].close < window[i - 1].close:
-            directional_closes += 1
+    prev_close = close[:-1]
+    cur_close = close[1:]
+
+    if direction_up:
+        directional_closes = sum(map(gt, cur_close, prev_close))
+        # Lows of the down days; a pullback fails if it held above origin
+        pullback_extremes = list(compress(low[1:], map(lt, cur_close, prev_close)))
+        held = pullback_extremes and max(pullback_extremes) > origin
+    else:
+        directional_closes = sum(map(lt, cur_close, prev_close))
+        # Highs of the up days; a pullback fails if it held below origin
+        pullback_extremes = list(compress(high[1:], map(gt, cur_close, prev_close)))
+        held = pullback_extremes and min(pullback_extremes) < origin
+
+    pullback_status = (
+        (bool(pullback_extremes) * _PULLBACK_OBSERVED)
+        | (bool(held) * _PULLBACK_FAILED)
+    )
 
     # --------------------------------------------------------
-    # Pullback detection
+    # Final decision
+    # Cheapest disqualifiers first; the retracement-depth scan
+    # (peak / trough) only runs once every other check has passed.
     # --------------------------------------------------------
 
-    pullback_observed = False
-    pullback_failed = False
-    expansion_origin = window[0].close
-
-    for i in range(1, len(window)):
-        prev = window[i - 1]
-        cur = window[i]
-
-        if direction == "UP" and cur.close < prev.close:
-            pullback_observed = True
-            if cur.low > expansion_origin:
-                pullback_failed = True
-
-        if direction == "DOWN" and cur.close > prev.close:
-            pullback_observed = True
-            if cur.high < expansion_origin:
-                pullback_failed = True
+    confirmed = (
+        fabs(net_move_ratio) >= min_move
+        and directional_closes >= min_closes
+        and pullback_status == _PULLBACK_OBSERVED | _PULLBACK_FAILED
+        and 1.0 - min(low) / max(high) <= max_retrace  # trough vs peak
+    )
 
-    # --------------------------------------------------------
-    # Retracement depth
-    # --------------------------------------------------------
+    return (
+        confirmed,
+        direction_up,
+        net_move_ratio,
+        directional_closes,
+        pullback_status,
+    )
 
-    peak = max(c.high for c in window)
-    trough = min(c.low for c in window)
-    retrace_pct = abs(percent_change(trough, peak))
 
-    # --------------------------------------------------------
-    # Final decision
-    # --------------------------------------------------------
+def evaluate_trend(candles: OHLCBatch) -> TrendDecision:
+    if len(candles) < LOOKBACK_DAYS + 1:
+        return TrendDecision(
+            decision="NO TREND",
+            direction=None,
+            reasons=["Insufficient daily data"],
+            diagnostics={}
+        )
 
-    confirmed = (
-        abs(net_move_pct) >= MIN_NET_MOVE_PCT
-        and directional_closes >= MIN_DIRECTIONAL_CLOSES
-        and pullback_observed
-        and pullback_failed
-        and retrace_pct <= MAX_RETRACE_PCT
+    close = candles.close[-LOOKBACK_DAYS:]
+
+    (
+        confirmed,
+        direction_up,
+        net_move_ratio,
+        directional_closes,
+        pullback_status,
+    ) = _trend_kernel(
+        close,
+        candles.high[-LOOKBACK_DAYS:],
+        candles.low[-LOOKBACK_DAYS:],
+        MIN_NET_MOVE_RATIO,
+        MIN_DIRECTIONAL_CLOSES,
+        MAX_RETRACE_RATIO,
     )
 
+    direction = "UP" if direction_up else "DOWN"
     decision = "TREND CONFIRMED" if confirmed else "NO TREND"
 
     diagnostics = {
         "direction": direction,
-        "price_then": start_price,
-        "price_now": end_price,
-        "net_move_pct": net_move_pct,
+        "price_then": close[0],
+        "price_now": close[-1],
+        "net_move_pct": net_move_ratio * 100.0,
         "directional_closes": directional_closes,
-        "pullback_observed": pullback_observed,
-        "pullback_failed": pullback_failed,
+        "pullback_observed": bool(pullback_status & _PULLBACK_OBSERVED),
+        "pullback_failed": bool(pullback_status & _PULLBACK_FAILED),
     }
 
     return TrendDecision(
@@ -156,6 +185,22 @@ def evaluate_trend(candles: List[Candle]) -> TrendDecision:
     )
 
 
+# ============================================================
+# Public decision function
+# ============================================================
+
+def trend_gate_decision(batch: Optional[OHLCBatch] = None) -> TrendDecision:
+    """
+    Pass `batch` (daily candles) to reuse data already loaded by the
+    caller; otherwise the candles are fetched here.
+    """
+
+    if batch is None:
+        batch = fetch_daily_candles()
+
+    return evaluate_trend(batch)
+
+
 # ============================================================
 # Presentation
 # ============================================================